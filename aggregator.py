@@ -0,0 +1,258 @@
+import bisect
+import sqlite3
+import threading
+import time
+
+from analyser import MIN_REPORTED_FRAMES
+
+# Rollup resolutions, keyed by the name used in queries.
+RESOLUTIONS = {
+    '1m': 60,
+    '15m': 15 * 60,
+    '1h': 60 * 60,
+}
+
+# Lower edges (km/h) of the speed histogram bins; the last bin is open-ended.
+SPEED_BINS_KPH = [0, 10, 20, 30, 40, 50, 60, 80, 100, 120, 150]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rollup_counts (
+    resolution   INTEGER NOT NULL,
+    bucket_start INTEGER NOT NULL,
+    site         TEXT    NOT NULL,
+    camera       TEXT    NOT NULL,
+    class_name   TEXT    NOT NULL,
+    count        INTEGER NOT NULL DEFAULT 0,
+    speed_tracks INTEGER NOT NULL DEFAULT 0,
+    speed_sum    REAL    NOT NULL DEFAULT 0,
+    speed_max    REAL    NOT NULL DEFAULT 0,
+    PRIMARY KEY (resolution, bucket_start, site, camera, class_name)
+);
+CREATE TABLE IF NOT EXISTS rollup_speed_hist (
+    resolution   INTEGER NOT NULL,
+    bucket_start INTEGER NOT NULL,
+    site         TEXT    NOT NULL,
+    camera       TEXT    NOT NULL,
+    class_name   TEXT    NOT NULL,
+    bin          INTEGER NOT NULL,
+    count        INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (resolution, bucket_start, site, camera, class_name, bin)
+);
+CREATE INDEX IF NOT EXISTS idx_rollup_counts_site
+    ON rollup_counts (resolution, site, bucket_start);
+CREATE INDEX IF NOT EXISTS idx_rollup_speed_hist_site
+    ON rollup_speed_hist (resolution, site, bucket_start);
+"""
+
+
+def speed_bin(speed_kph):
+    """Index of the histogram bin for a speed in km/h."""
+    return max(0, bisect.bisect_right(SPEED_BINS_KPH, speed_kph) - 1)
+
+
+def speed_bin_label(index):
+    low = SPEED_BINS_KPH[index]
+    if index + 1 < len(SPEED_BINS_KPH):
+        return f"{low}-{SPEED_BINS_KPH[index + 1]}"
+    return f"{low}+"
+
+
+class RollupAggregator:
+    """
+    Incremental, time-bucketed rollups of finalized tracks from many streams.
+
+    Every finalized track (an entry as produced by Analyser.collect_finalized_tracks)
+    is added once to the 1-minute, 15-minute and hourly buckets of its camera,
+    keyed by the wall-clock time it entered the scene. Counts include every
+    track, matching the job report's total_objects_per_class; speed statistics
+    and histograms only use tracks longer than MIN_REPORTED_FRAMES, the same
+    ones listed in all_tracked_objects. Rollups live in an
+    embedded SQLite database; queries only read the rollup tables, so their
+    cost depends on the number of buckets in range, not on track history.
+    """
+
+    def __init__(self, db_path=":memory:"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------ ingest
+    def ingest_tracks(self, site, camera, tracks, stream_start_time, fps):
+        """
+        Adds finalized tracks of one camera to the rollups.
+        stream_start_time is the wall-clock time (epoch seconds) of frame 0.
+        Safe to call from many Analyser threads at once.
+        """
+        if not tracks:
+            return 0
+
+        counts = {}
+        hist = {}
+        for track in tracks:
+            timestamp = stream_start_time + track['entry_frame'] / fps
+            class_name = track['class_name']
+            has_speed = track.get('total_frames_tracked', 0) > MIN_REPORTED_FRAMES
+            speed = track.get('avg_speed_kph', 0.0) if has_speed else 0.0
+            max_speed = track.get('max_speed_kph', 0.0) if has_speed else 0.0
+
+            for resolution in RESOLUTIONS.values():
+                bucket_start = int(timestamp // resolution * resolution)
+                key = (resolution, bucket_start, site, camera, class_name)
+                n, n_speed, speed_sum, speed_max = counts.get(key, (0, 0, 0.0, 0.0))
+                counts[key] = (n + 1, n_speed + has_speed, speed_sum + speed, max(speed_max, max_speed))
+                if has_speed:
+                    hist_key = key + (speed_bin(speed),)
+                    hist[hist_key] = hist.get(hist_key, 0) + 1
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                """
+                INSERT INTO rollup_counts (resolution, bucket_start, site, camera, class_name, count, speed_tracks, speed_sum, speed_max)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (resolution, bucket_start, site, camera, class_name) DO UPDATE SET
+                    count = count + excluded.count,
+                    speed_tracks = speed_tracks + excluded.speed_tracks,
+                    speed_sum = speed_sum + excluded.speed_sum,
+                    speed_max = MAX(speed_max, excluded.speed_max)
+                """,
+                [key + value for key, value in counts.items()],
+            )
+            self._conn.executemany(
+                """
+                INSERT INTO rollup_speed_hist (resolution, bucket_start, site, camera, class_name, bin, count)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (resolution, bucket_start, site, camera, class_name, bin) DO UPDATE SET
+                    count = count + excluded.count
+                """,
+                [key + (value,) for key, value in hist.items()],
+            )
+        return len(tracks)
+
+    # ------------------------------------------------------------------ queries
+    @staticmethod
+    def _where(resolution, site, camera, start, end):
+        if resolution not in RESOLUTIONS:
+            raise ValueError(f"Unknown resolution '{resolution}'. Use one of: {', '.join(RESOLUTIONS)}")
+        clauses = ["resolution = ?"]
+        params = [RESOLUTIONS[resolution]]
+        if site is not None:
+            clauses.append("site = ?")
+            params.append(site)
+        if camera is not None:
+            clauses.append("camera = ?")
+            params.append(camera)
+        if start is not None:
+            clauses.append("bucket_start >= ?")
+            params.append(int(start))
+        if end is not None:
+            clauses.append("bucket_start < ?")
+            params.append(int(end))
+        return " AND ".join(clauses), params
+
+    def query_counts(self, resolution='1m', site=None, camera=None, start=None, end=None,
+                     per_camera=False, per_site=False):
+        """
+        Object counts per bucket and class. per_camera keeps every camera
+        apart, per_site sums the cameras of each site; otherwise everything
+        selected is summed (one site's view when site is given, all sites
+        otherwise). Counts cover every track; avg/max speed only tracks
+        longer than MIN_REPORTED_FRAMES.
+        """
+        where, params = self._where(resolution, site, camera, start, end)
+        if per_camera:
+            group = select = "bucket_start, site, camera, class_name"
+        elif per_site:
+            group = "bucket_start, site, class_name"
+            select = "bucket_start, site, NULL, class_name"
+        else:
+            group = "bucket_start, class_name"
+            select = "bucket_start, NULL, NULL, class_name"
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"""
+                SELECT {select}, SUM(count), SUM(speed_tracks), SUM(speed_sum), MAX(speed_max)
+                FROM rollup_counts WHERE {where}
+                GROUP BY {group} ORDER BY {group}
+                """,
+                params,
+            ).fetchall()
+
+        results = []
+        for bucket_start, row_site, row_camera, class_name, count, speed_tracks, speed_sum, speed_max in rows:
+            entry = {
+                "bucket_start": bucket_start,
+                "class_name": class_name,
+                "count": count,
+                "avg_speed_kph": round(speed_sum / speed_tracks, 2) if speed_tracks else 0.0,
+                "max_speed_kph": round(speed_max, 2),
+            }
+            if per_camera or per_site:
+                entry["site"] = row_site
+            if per_camera:
+                entry["camera"] = row_camera
+            results.append(entry)
+        return results
+
+    def query_speed_distribution(self, resolution='1h', site=None, camera=None, start=None, end=None, class_name=None):
+        """
+        Speed histogram (bin label -> track count) summed over the selected
+        buckets, over tracks longer than MIN_REPORTED_FRAMES.
+        """
+        where, params = self._where(resolution, site, camera, start, end)
+        if class_name is not None:
+            where += " AND class_name = ?"
+            params.append(class_name)
+
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT bin, SUM(count) FROM rollup_speed_hist WHERE {where} GROUP BY bin ORDER BY bin",
+                params,
+            ).fetchall()
+
+        distribution = {speed_bin_label(i): 0 for i in range(len(SPEED_BINS_KPH))}
+        for bin_index, count in rows:
+            distribution[speed_bin_label(bin_index)] = count
+        return distribution
+
+    def list_streams(self):
+        """Known (site, camera) pairs."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT site, camera FROM rollup_counts ORDER BY site, camera"
+            ).fetchall()
+        return [{"site": site, "camera": camera} for site, camera in rows]
+
+
+class StreamFeed:
+    """
+    Connects one Analyser to a RollupAggregator: call poll() periodically while
+    processing and flush() at the end of the stream.
+    """
+
+    def __init__(self, aggregator, analyser, site, camera, stream_start_time=None, idle_frames=None):
+        self.aggregator = aggregator
+        self.analyser = analyser
+        self.site = site
+        self.camera = camera
+        self.stream_start_time = time.time() if stream_start_time is None else stream_start_time
+        # A track is final once the tracker would have dropped it (max_age=30)
+        # and it can no longer be merged by the re-identification cache.
+        if idle_frames is None:
+            idle_frames = max(30, analyser.reid.merge_window) if analyser.reid is not None else 30
+        self.idle_frames = idle_frames
+        self.ingested = 0
+
+    def poll(self, frame_number):
+        tracks = self.analyser.collect_finalized_tracks(frame_number, idle_frames=self.idle_frames)
+        self.ingested += self.aggregator.ingest_tracks(self.site, self.camera, tracks, self.stream_start_time, self.analyser.fps)
+
+    def flush(self, frame_number):
+        tracks = self.analyser.collect_finalized_tracks(frame_number, final=True)
+        self.ingested += self.aggregator.ingest_tracks(self.site, self.camera, tracks, self.stream_start_time, self.analyser.fps)
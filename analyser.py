@@ -2,9 +2,14 @@
 import numpy as np
 import collections
 
+from reid import color_histogram
+
 
 PIXELS_PER_METER_FACTOR = 5 
 FPS_DEFAULT = 30 
+# Tracks must last longer than this to appear in all_tracked_objects
+# (shorter ones are still counted in total_objects_per_class).
+MIN_REPORTED_FRAMES = 10
 
 class ObjectData:
     """A simple class to hold state for a single tracked object, updated for speed."""
@@ -22,14 +27,27 @@ class ObjectData:
         self.avg_speed_kph = 0.0
         self.max_speed_kph = 0.0
 
+        # Used by the re-identification cache (see reid.py).
+        self.box_size = 0
+        self.descriptor = None
+
 class Analyser:
-    def __init__(self, detector_class_names, fps=FPS_DEFAULT, scale_factor=PIXELS_PER_METER_FACTOR):
-        """Initializes the analysis state."""
+    def __init__(self, detector_class_names, fps=FPS_DEFAULT, scale_factor=PIXELS_PER_METER_FACTOR, reid=None):
+        """
+        Initializes the analysis state. reid is an optional reid.ReIdCache; with it,
+        new tracker IDs that re-identify a recently lost track are merged into
+        that track instead of being counted again.
+        """
         self.tracked_objects_data = {} 
         self.class_names = detector_class_names
         self.total_counts = {name: 0 for name in self.class_names.values()}
         self.fps = fps
         self.scale_factor = scale_factor
+        self.finalized_track_ids = set()
+        self.reid = reid
+        self.track_aliases = {}
+        self._active_ids = set()
+        self._active_raw_ids = set()
         print("Analyser initialized.")
 
     def _calculate_speed(self, obj_data):
@@ -55,16 +73,23 @@ class Analyser:
         
         return speed_kph
 
-    def analyse_frame(self, tracked_objects, frame_number):
+    def analyse_frame(self, tracked_objects, frame_number, frame=None):
         """
         Processes the tracked objects for the current frame.
+        frame is only needed for appearance-based re-identification.
         Returns a list of 7 values per object: (x1, y1, x2, y2, track_id, class_id, speed_kph)
+        where track_id is the merged (re-identified) ID.
         """
         current_frame_analysis = [] 
+        current_ids = set()
+        reid = self.reid
+        use_appearance = reid is not None and reid.use_appearance and frame is not None
         
         if hasattr(tracked_objects, 'tolist'):
             tracked_objects = tracked_objects.tolist()
 
+        resolved = self._resolve_aliases([int(obj[4]) for obj in tracked_objects if len(obj) >= 6])
+
         for obj in tracked_objects:
             if len(obj) < 6: continue 
                 
@@ -75,15 +100,36 @@ class Analyser:
             x_center = (x1 + x2) // 2
             y_center = (y1 + y2) // 2
             current_speed = 0.0
+            box_size = max(x2 - x1, y2 - y1)
+            track_id = resolved[track_id]
 
             if track_id not in self.tracked_objects_data:
-                
-                self.tracked_objects_data[track_id] = ObjectData(track_id, class_name, frame_number)
-                self.total_counts[class_name] = self.total_counts.get(class_name, 0) + 1 
+                descriptor = color_histogram(frame, (x1, y1, x2, y2)) if use_appearance else None
+                match = None
+                if reid is not None:
+                    match = reid.match(class_name, x_center, y_center, box_size, frame_number, descriptor)
+
+                if match is not None:
+                    self.track_aliases[track_id] = match
+                    track_id = match
+                else:
+                    self.tracked_objects_data[track_id] = ObjectData(track_id, class_name, frame_number)
+                    self.total_counts[class_name] = self.total_counts.get(class_name, 0) + 1 
+                    self.tracked_objects_data[track_id].descriptor = descriptor
             
          
             obj_data = self.tracked_objects_data[track_id]
             obj_data.exit_frame = frame_number
+            obj_data.box_size = box_size
+            current_ids.add(track_id)
+            if use_appearance and obj_data.duration_frames % reid.descriptor_every == 0:
+                # Running average, so a frame of partial occlusion doesn't
+                # replace the object's appearance.
+                descriptor = color_histogram(frame, (x1, y1, x2, y2))
+                if obj_data.descriptor is None:
+                    obj_data.descriptor = descriptor
+                elif descriptor is not None:
+                    obj_data.descriptor = 0.7 * obj_data.descriptor + 0.3 * descriptor
             
             obj_data.path.append((x_center, y_center, frame_number))
             obj_data.duration_frames += 1
@@ -99,9 +145,78 @@ class Analyser:
             
            
             current_frame_analysis.append((x1, y1, x2, y2, track_id, class_id, current_speed))
+
+        if reid is not None:
+            for lost_id in self._active_ids - current_ids:
+                reid.add(self.tracked_objects_data[lost_id])
+            reid.expire(frame_number)
+        self._active_ids = current_ids
+        self._active_raw_ids = set(resolved)
             
         return current_frame_analysis 
 
+    def _resolve_aliases(self, raw_ids):
+        """
+        Maps this frame's tracker IDs to merged track IDs so that no two boxes
+        share one. If a merged track's original ID comes back while an ID that
+        was re-identified as it is still around, the merge was wrong: the
+        original keeps the track and the other ID becomes an object of its own.
+        """
+        present = set(raw_ids)
+        if self.reid is not None:
+            # Tracks that are back, under their own ID or an alias, are no
+            # longer lost, so new IDs cannot be merged into them.
+            for raw in present:
+                self.reid.discard(self.track_aliases.get(raw, raw))
+
+        def priority(raw):
+            # Original IDs first, then aliases that were active last frame.
+            if raw not in self.track_aliases:
+                return 0
+            return 1 if raw in self._active_raw_ids else 2
+
+        claimed = set()
+        resolved = {}
+        for raw in sorted(present, key=priority):
+            canonical = self.track_aliases.get(raw, raw)
+            if canonical in claimed:
+                del self.track_aliases[raw]
+                canonical = raw
+            claimed.add(canonical)
+            resolved[raw] = canonical
+        return resolved
+
+
+    def _track_record(self, id, data):
+        """Report entry for one tracked object (same shape as in all_tracked_objects)."""
+        return {
+            "track_id": id,
+            "class_name": data.class_name,
+            "entry_frame": data.entry_frame,
+            "exit_frame": data.exit_frame,
+            "total_frames_tracked": data.duration_frames,
+            "avg_speed_kph": round(data.avg_speed_kph, 2),
+            "max_speed_kph": round(data.max_speed_kph, 2),
+            "path_length": len(data.path)
+        }
+
+    def collect_finalized_tracks(self, frame_number, idle_frames=30, final=False):
+        """
+        Returns report entries for tracks not seen for more than idle_frames
+        (or all remaining tracks when final=True). Each track is returned once,
+        so this can be polled while processing to feed a downstream aggregator.
+        Unlike all_tracked_objects, short tracks are included too, so the
+        entries add up to total_objects_per_class.
+        """
+        finalized = []
+        for id, data in self.tracked_objects_data.items():
+            if id in self.finalized_track_ids:
+                continue
+            if not final and frame_number - data.exit_frame <= idle_frames:
+                continue
+            self.finalized_track_ids.add(id)
+            finalized.append(self._track_record(id, data))
+        return finalized
 
     def get_final_report_data(self):
         """Formats the final data structure for saving."""
@@ -109,17 +224,8 @@ class Analyser:
         
         for id, data in self.tracked_objects_data.items():
            
-            if data.duration_frames > 10:
-                all_tracked_objects_list.append({
-                    "track_id": id,
-                    "class_name": data.class_name,
-                    "entry_frame": data.entry_frame,
-                    "exit_frame": data.exit_frame,
-                    "total_frames_tracked": data.duration_frames,
-                    "avg_speed_kph": round(data.avg_speed_kph, 2),
-                    "max_speed_kph": round(data.max_speed_kph, 2),
-                    "path_length": len(data.path)
-                })
+            if data.duration_frames > MIN_REPORTED_FRAMES:
+                all_tracked_objects_list.append(self._track_record(id, data))
         
         report = {
             "total_objects_per_class": self.total_counts,
@@ -1,5 +1,4 @@
 import argparse
-import cv2
 import time
 import os
 import uuid 
@@ -10,11 +9,22 @@ from detector import Detector
 from tracker import Tracker
 from analyser import Analyser # Analyser must be imported
 from utils import save_reports # Keep save_reports
+from renderer import AnnotationRenderer
+from frame_pool import FramePool
+from aggregator import StreamFeed
+from scheduler import StreamSettings
+from reid import ReIdCache
+from estimator import run_estimate
+
+# NOTE: cv2 (and torch via Detector/Tracker) are imported lazily inside the
+# functions below so that `import analysis_core` and `--help` stay fast.
 
 # --------------------------------------------------------------------------
 # --- NEW DRAWING FUNCTION ADDED ---
+# (Reference implementation; run_analysis uses renderer.AnnotationRenderer.)
 def draw_boxes_green(frame, tracked_objects_with_speed, class_names, frame_number):
     """Draws green bounding boxes, IDs, and speeds on the frame."""
+    import cv2
     
     # Draw frame number
     cv2.putText(frame, f"Frame: {frame_number}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
@@ -50,16 +60,41 @@ def draw_boxes_green(frame, tracked_objects_with_speed, class_names, frame_numbe
 # --------------------------------------------------------------------------
 
 
-def run_analysis(video_path: str, output_dir: str, file_id: str) -> dict:
-    """Core function to run the full analysis pipeline on a video file."""
+def run_analysis(video_path: str, output_dir: str, file_id: str, render_every: int = 1, frame_pool_size: int = 4,
+                 aggregator=None, site: str = "default", camera: str = None, stream_start_time: float = None,
+                 scheduler=None, reid_window: int = 45, reid_appearance: bool = True) -> dict:
+    """
+    Core function to run the full analysis pipeline on a video file.
+    render_every > 1 rebuilds the annotation overlay only every N frames.
+    frame_pool_size is the number of preallocated decode buffers, used in turn
+    (this loop holds one frame at a time).
+    If an aggregator (aggregator.RollupAggregator) is given, finalized tracks are
+    streamed into its rollups under (site, camera); camera defaults to file_id.
+    If a scheduler (scheduler.LoadScheduler) is given, the job is admitted through it
+    (NodeOverloadedError when the node refuses new jobs) and follows its
+    degradation level; every step is recorded under metadata['quality'].
+    reid_window is the merge window (frames) for re-identifying tracks that got a
+    new ID after an occlusion (None disables it); reid_appearance (on by default)
+    adds a colour histogram check to the motion gate, which avoids most wrong
+    merges between nearby objects.
+    """
+    import cv2
+
     print(f"Processing... Video: {video_path}")
     
     cap = None
     out = None
+    stream = None
     try:
        
         detector = Detector(model_path='yolov8n.pt') 
-        tracker = Tracker() 
+        reid = None
+        if reid_window:
+            reid = ReIdCache(merge_window=reid_window, use_appearance=reid_appearance)
+        # With re-identification, long coasting tracks are left to the cache
+        # (motion extrapolation) instead of being drawn/counted by the tracker.
+        tracker = Tracker(max_coast_frames=5 if reid is not None else None) 
+        renderer = AnnotationRenderer(render_every=render_every)
         
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
@@ -71,13 +106,23 @@ def run_analysis(video_path: str, output_dir: str, file_id: str) -> dict:
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
         
         # Initialize Analyser with FPS
-        analyser = Analyser(detector.class_names, fps=fps)
+        analyser = Analyser(detector.class_names, fps=fps, reid=reid)
+        feed = None
+        if aggregator is not None:
+            feed = StreamFeed(aggregator, analyser, site, camera or file_id, stream_start_time)
         
         output_video_name = f"{file_id}_processed_video.mp4"
         output_video_path = os.path.join(output_dir, output_video_name)
         
         fourcc = cv2.VideoWriter_fourcc(*'mp4v') 
         out = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
+
+        # Frames are decoded into preallocated buffers instead of a new array
+        # per frame.
+        frame_pool = FramePool((height, width, 3), size=frame_pool_size)
+
+        if scheduler is not None:
+            stream = scheduler.open_stream(file_id, fps)
         
     except Exception as e:
         print(f"Error during analysis initialization: {e}")
@@ -90,33 +135,55 @@ def run_analysis(video_path: str, output_dir: str, file_id: str) -> dict:
     start_time = time.time()
     print("Starting frame processing...")
 
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret: break
+    settings = stream.settings if stream is not None else StreamSettings(0, None, 1)
+    tracked_objects_with_speed = []
 
-        frame_number += 1
-        
-       
-        detections = detector.detect(frame)
-        
-        
-        tracked_objects = tracker.update(detections, frame) 
+    try:
+        while cap.isOpened():
+            frame_buf = frame_pool.read(cap, frame_number + 1)
+            if frame_buf is None: break
 
-        
-        # FIX: Capture the return value from analyser.analyse_frame
-        tracked_objects_with_speed = analyser.analyse_frame(tracked_objects, frame_number)
-        
-        
-        # FIX: Pass the 7-value list to the drawing function
-        processed_frame = draw_boxes_green(frame, tracked_objects_with_speed, detector.class_names, frame_number)
-        out.write(processed_frame)
+            frame_number += 1
+            frame = frame_buf.array
+            
+            # Under load shedding detection/tracking only runs every
+            # detect_stride frames; in between the last results are reused.
+            if (frame_number - 1) % settings.detect_stride == 0:
+                detections = detector.detect(frame, imgsz=settings.imgsz)
+                
+                
+                tracked_objects = tracker.update(detections, frame) 
+
+                
+                # FIX: Capture the return value from analyser.analyse_frame
+                tracked_objects_with_speed = analyser.analyse_frame(tracked_objects, frame_number, frame)
+            
+            
+            if settings.render:
+                # FIX: Pass the 7-value list to the drawing function
+                # Nothing else holds the frame any more, so it is annotated in place.
+                processed_frame = renderer.render(frame, tracked_objects_with_speed, detector.class_names, frame_number)
+                out.write(processed_frame)
+            else:
+                out.write(frame)
+            frame_buf.release()
+
+            if stream is not None:
+                settings = stream.tick(frame_number)
 
-        if frame_number % 100 == 0:
-            print(f"  > Processed {frame_number} frames.")
+            if frame_number % 100 == 0:
+                print(f"  > Processed {frame_number} frames.")
+                if feed is not None:
+                    feed.poll(frame_number)
+    finally:
+        cap.release()
+        out.release()
+        if stream is not None:
+            stream.close()
 
 
-    cap.release()
-    out.release()
+    if feed is not None:
+        feed.flush(frame_number)
     
     end_time = time.time()
     
@@ -137,6 +204,14 @@ def run_analysis(video_path: str, output_dir: str, file_id: str) -> dict:
         'video_height': height,
         'analysis_time_seconds': round(end_time - start_time, 2)
     }
+    if stream is not None:
+        final_data['metadata']['quality'] = stream.metadata()
+    if reid is not None:
+        final_data['metadata']['reid'] = {
+            'merge_window_frames': reid.merge_window,
+            'appearance': reid.use_appearance,
+            'merged_tracks': reid.merges,
+        }
     
     save_reports(final_data, fps, output_dir, file_id) 
 
@@ -148,6 +223,14 @@ def main_cli():
     parser = argparse.ArgumentParser(description="Realtime Counting Analyser (Terminal Version)")
     parser.add_argument('--video', type=str, required=True, help='Path to the input video file (.mp4, .mov, .avi).')
     parser.add_argument('--output-dir', type=str, default='output', help='Directory to save results.')
+    parser.add_argument('--render-every', type=int, default=1, help='Rebuild box/label overlay every N frames (1 = every frame).')
+    parser.add_argument('--reid-window', type=int, default=45, help='Frames within which a new track can be merged into a lost one (0 disables).')
+    parser.add_argument('--no-reid-appearance', dest='reid_appearance', action='store_false', help='Merge tracks on motion alone, without comparing colour histograms.')
+    parser.add_argument('--estimate', action='store_true', help='Quick estimate: analyse sampled windows only and extrapolate (no processed video).')
+    parser.add_argument('--sample-fraction', type=float, default=0.1, help='Fraction of the video to analyse in --estimate mode.')
+    parser.add_argument('--window-seconds', type=float, default=10.0, help='Length of each sampled window in --estimate mode.')
+    parser.add_argument('--sampling', type=str, default='stratified', choices=['stratified', 'random'], help='Window sampling strategy in --estimate mode.')
+    parser.add_argument('--workers', type=int, default=1, help='Worker processes for --estimate mode.')
     
     args = parser.parse_args()
     
@@ -158,10 +241,17 @@ def main_cli():
     os.makedirs(cli_output_dir, exist_ok=True) 
 
     try:
-        run_analysis(video_path, cli_output_dir, cli_file_id)
+        if args.estimate:
+            run_estimate(video_path, cli_output_dir, cli_file_id, sample_fraction=args.sample_fraction,
+                         window_seconds=args.window_seconds, strategy=args.sampling, workers=args.workers,
+                         reid_window=args.reid_window, reid_appearance=args.reid_appearance)
+        else:
+            run_analysis(video_path, cli_output_dir, cli_file_id, render_every=args.render_every,
+                         reid_window=args.reid_window, reid_appearance=args.reid_appearance)
         
         print(f"\nResults successfully saved in the '{cli_output_dir}' directory:")
-        print(f" - Processed Video: {cli_output_dir}/{cli_file_id}_processed_video.mp4")
+        if not args.estimate:
+            print(f" - Processed Video: {cli_output_dir}/{cli_file_id}_processed_video.mp4")
         print(f" - Data JSON: {cli_output_dir}/{cli_file_id}_results.json")
         print(f" - Summary CSV: {cli_output_dir}/{cli_file_id}_report.csv")
         print("\nProcessing complete!")
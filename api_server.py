@@ -1,17 +1,27 @@
 
 import os
 import uuid
+from typing import Optional
 from fastapi  import FastAPI, UploadFile, File, HTTPException
 from fastapi.responses  import JSONResponse, FileResponse, HTMLResponse
 from fastapi.middleware.cors  import CORSMiddleware
 from starlette.requests  import Request
-from main  import run_analysis 
+from starlette.concurrency import run_in_threadpool
+from analysis_core import run_analysis
+from estimator import run_estimate
+from aggregator import RollupAggregator
+from scheduler import LoadScheduler, NodeOverloadedError
 
 UPLOAD_DIR = "uploads"
 OUTPUT_DIR = "output"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# Shared by every analysis job; dashboard queries read only the rollups.
+aggregator = RollupAggregator(os.path.join(OUTPUT_DIR, "rollups.sqlite"))
+# Degrades running jobs and refuses new ones when the node falls behind.
+scheduler = LoadScheduler()
+
 
 app = FastAPI(title="SpeedVision AI Analysis API")
 
@@ -24,8 +34,19 @@ app.add_middleware(
 )
 
 @app.post("/analyze-video")
-async def analyze_video_endpoint(video_file: UploadFile = File(...)):
-    """Handles video file upload, runs analysis, and returns results."""
+async def analyze_video_endpoint(video_file: UploadFile = File(...), site: str = "default", camera: Optional[str] = None,
+                                 estimate: bool = False, sample_fraction: float = 0.1,
+                                 stream_start_time: Optional[float] = None):
+    """
+    Handles video file upload, runs analysis, and returns results.
+    stream_start_time (epoch seconds) is when the recording started; it places the
+    tracks in the right rollup buckets (defaults to the time of processing).
+    """
+    
+    try:
+        scheduler.check_admission()
+    except NodeOverloadedError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     
     
     file_id = "job-" + str(uuid.uuid4())
@@ -46,7 +67,15 @@ async def analyze_video_endpoint(video_file: UploadFile = File(...)):
    
     try:
         
-        final_data = run_analysis(video_path, OUTPUT_DIR, file_id)
+        if estimate:
+            # Sampled quick estimate: no processed video, not fed into the rollups.
+            final_data = await run_in_threadpool(run_estimate, video_path, OUTPUT_DIR, file_id, sample_fraction=sample_fraction)
+        else:
+            # Run in a worker thread so the event loop keeps serving requests
+            # (and the scheduler sees concurrent jobs).
+            final_data = await run_in_threadpool(run_analysis, video_path, OUTPUT_DIR, file_id, aggregator=aggregator,
+                                                 site=site, camera=camera, stream_start_time=stream_start_time,
+                                                 scheduler=scheduler)
         
        
         os.remove(video_path) 
@@ -56,9 +85,16 @@ async def analyze_video_endpoint(video_file: UploadFile = File(...)):
             "status": "success",
             "message": "Analysis completed successfully.",
             "file_id": file_id,
-            "total_objects_per_class": final_data.get('total_objects_per_class', {})
+            "total_objects_per_class": final_data.get('total_objects_per_class', {}),
+            "estimated": final_data.get('estimated', False),
+            "quality": final_data.get('metadata', {}).get('quality')
         }
 
+    except NodeOverloadedError as e:
+        if os.path.exists(video_path):
+            os.remove(video_path)
+        raise HTTPException(status_code=503, detail=str(e))
+
     except Exception as e:
         print(f"Analysis failed for {file_id}: {e}")
         
@@ -67,6 +103,34 @@ async def analyze_video_endpoint(video_file: UploadFile = File(...)):
         raise HTTPException(status_code=500, detail=f"Video analysis failed: {e}")
 
 
+@app.get("/rollups/counts")
+async def rollup_counts(resolution: str = "1m", site: Optional[str] = None, camera: Optional[str] = None,
+                        start: Optional[int] = None, end: Optional[int] = None, per_camera: bool = False,
+                        per_site: bool = False):
+    """Time-bucketed object counts per class (per camera, per site or overall)."""
+    try:
+        return aggregator.query_counts(resolution, site=site, camera=camera, start=start, end=end,
+                                       per_camera=per_camera, per_site=per_site)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/rollups/speeds")
+async def rollup_speeds(resolution: str = "1h", site: Optional[str] = None, camera: Optional[str] = None,
+                        start: Optional[int] = None, end: Optional[int] = None, class_name: Optional[str] = None):
+    """Speed distribution (km/h histogram) over the selected buckets."""
+    try:
+        return aggregator.query_speed_distribution(resolution, site=site, camera=camera, start=start, end=end, class_name=class_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/rollups/streams")
+async def rollup_streams():
+    """Lists the (site, camera) pairs that have rollups."""
+    return aggregator.list_streams()
+
+
 @app.get("/download/{file_type}/{file_id}")
 async def download_file(file_type: str, file_id: str):
     """Serves processed files (video, csv, json) by file_id."""
@@ -0,0 +1,99 @@
+import argparse
+import os
+import tempfile
+import resource
+import time
+
+import cv2
+import numpy as np
+
+from frame_pool import FramePool
+from renderer import AnnotationRenderer
+
+# Decode + annotate loop with and without the frame pool. Frame-sized arrays
+# are mmap'd by the allocator, so allocator churn shows up as minor page
+# faults; those are reported per frame alongside wall time.
+
+
+def make_video(path, width, height, n_frames, fps=30):
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), fps, (width, height))
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 255, size=(height, width, 3), dtype=np.uint8)
+    for i in range(n_frames):
+        writer.write(np.roll(base, i * 8, axis=1))
+    writer.release()
+
+
+def run_plain(video_path, renderer, objects, class_names):
+    cap = cv2.VideoCapture(video_path)
+    n = 0
+    while True:
+        ret, frame = cap.read()
+        if not ret: break
+        n += 1
+        renderer.render(frame, objects, class_names, n)
+    cap.release()
+    return n
+
+
+def run_pooled(video_path, renderer, objects, class_names, shape):
+    cap = cv2.VideoCapture(video_path)
+    frame_pool = FramePool(shape, size=4)
+    n = 0
+    while True:
+        frame_buf = frame_pool.read(cap, n + 1)
+        if frame_buf is None: break
+        n += 1
+        renderer.render(frame_buf.array, objects, class_names, n)
+        frame_buf.release()
+    cap.release()
+    return n, frame_pool.copies
+
+
+def measure(fn):
+    faults_before = resource.getrusage(resource.RUSAGE_SELF).ru_minflt
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    faults = resource.getrusage(resource.RUSAGE_SELF).ru_minflt - faults_before
+    return result, elapsed, faults
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame buffer pool benchmark")
+    parser.add_argument('--video', type=str, default=None, help='Video to decode (default: synthetic clip).')
+    parser.add_argument('--width', type=int, default=3840)
+    parser.add_argument('--height', type=int, default=2160)
+    parser.add_argument('--frames', type=int, default=60)
+    args = parser.parse_args()
+
+    tmp_path = None
+    video_path = args.video
+    if video_path is None:
+        fd, tmp_path = tempfile.mkstemp(suffix='.avi')
+        os.close(fd)
+        make_video(tmp_path, args.width, args.height, args.frames)
+        video_path = tmp_path
+
+    try:
+        cap = cv2.VideoCapture(video_path)
+        shape = (int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)), int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), 3)
+        cap.release()
+
+        class_names = {2: 'car'}
+        objects = [(100 + 60 * i, 300, 150 + 60 * i, 360, i, 2, 30.0) for i in range(40)]
+
+        n, plain_time, plain_faults = measure(lambda: run_plain(video_path, AnnotationRenderer(), objects, class_names))
+        (_, copies), pool_time, pool_faults = measure(lambda: run_pooled(video_path, AnnotationRenderer(), objects, class_names, shape))
+
+        frame_mb = np.prod(shape) / 1e6
+        print(f"{n} frames at {shape[1]}x{shape[0]} ({frame_mb:.1f} MB/frame)")
+        print(f"cap.read():          {plain_time * 1000 / n:7.2f} ms/frame, {plain_faults / n:9.0f} page faults/frame")
+        print(f"FramePool.read():    {pool_time * 1000 / n:7.2f} ms/frame, {pool_faults / n:9.0f} page faults/frame (decoder copies: {copies})")
+    finally:
+        if tmp_path:
+            os.remove(tmp_path)
+
+
+if __name__ == "__main__":
+    main()
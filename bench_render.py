@@ -0,0 +1,63 @@
+import argparse
+import time
+import numpy as np
+
+from analysis_core import draw_boxes_green
+from renderer import AnnotationRenderer
+
+# Compares the legacy per-object cv2 drawing against AnnotationRenderer on
+# synthetic dense scenes with objects that drift a little every frame.
+
+
+def make_scene(n_objects, width, height, n_frames, seed=0):
+    """Returns per-frame lists of (x1, y1, x2, y2, track_id, cls_id, speed)."""
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform([0, 40], [width - 120, height - 120], size=(n_objects, 2))
+    size = rng.uniform(30, 110, size=(n_objects, 2))
+    vel = rng.uniform(-3, 3, size=(n_objects, 2))
+    speed = rng.uniform(0, 90, size=n_objects)
+    cls_ids = rng.choice([0, 2, 5, 7], size=n_objects)
+
+    frames = []
+    for _ in range(n_frames):
+        pos = np.clip(pos + vel, 0, [width - 120, height - 120])
+        speed = np.clip(speed + rng.normal(0, 0.3, size=n_objects), 0, None)
+        frames.append([
+            (int(x), int(y), int(x + w), int(y + h), i + 1, int(c), float(s))
+            for i, ((x, y), (w, h), c, s) in enumerate(zip(pos, size, cls_ids, speed))
+        ])
+    return frames
+
+
+def bench(draw, frames, width, height):
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    start = time.perf_counter()
+    for n, objects in enumerate(frames, 1):
+        draw(frame, objects, n)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Annotation rendering benchmark")
+    parser.add_argument('--objects', type=int, default=150)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--width', type=int, default=1920)
+    parser.add_argument('--height', type=int, default=1080)
+    parser.add_argument('--render-every', type=int, default=1)
+    args = parser.parse_args()
+
+    class_names = {0: 'person', 2: 'car', 5: 'bus', 7: 'truck'}
+    frames = make_scene(args.objects, args.width, args.height, args.frames)
+    per_object = args.objects * args.frames
+
+    legacy = bench(lambda f, o, n: draw_boxes_green(f, o, class_names, n), frames, args.width, args.height)
+    renderer = AnnotationRenderer(render_every=args.render_every)
+    cached = bench(lambda f, o, n: renderer.render(f, o, class_names, n), frames, args.width, args.height)
+
+    print(f"draw_boxes_green:   {legacy * 1e6 / per_object:8.2f} us/object  ({legacy:.2f} s)")
+    print(f"AnnotationRenderer: {cached * 1e6 / per_object:8.2f} us/object  ({cached:.2f} s)")
+    print(f"Speed-up: {legacy / cached:.1f}x  (sprite hits {renderer.sprite_hits}, misses {renderer.sprite_misses})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+# Measures cold-start import time of the project's entry points. Each module is
+# imported in a fresh interpreter so that caches from earlier runs don't skew
+# the numbers; we also record whether torch got pulled in.
+
+MODULES = ['report', 'analyser', 'utils', 'detector', 'tracker', 'analysis_core', 'api_server']
+
+_PROBE = (
+    "import sys, time\n"
+    "t0 = time.perf_counter()\n"
+    "import {module}\n"
+    "t1 = time.perf_counter()\n"
+    "print(t1 - t0, 'torch' in sys.modules, 'cv2' in sys.modules)\n"
+)
+
+
+def measure_import(module, repeats=5):
+    """Returns (best_seconds, torch_loaded, cv2_loaded) for importing module."""
+    best = None
+    torch_loaded = cv2_loaded = False
+    for _ in range(repeats):
+        result = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(module=module)],
+            capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+        seconds, torch_flag, cv2_flag = result.stdout.split()[-3:]
+        seconds = float(seconds)
+        best = seconds if best is None else min(best, seconds)
+        torch_loaded = torch_flag == 'True'
+        cv2_loaded = cv2_flag == 'True'
+    return best, torch_loaded, cv2_loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time benchmark")
+    parser.add_argument('--repeats', type=int, default=5, help='Fresh interpreters per module (best is reported).')
+    parser.add_argument('--json', type=str, default=None, help='Optional path to write the results as JSON.')
+    args = parser.parse_args()
+
+    results = {}
+    start = time.perf_counter()
+    for module in MODULES:
+        seconds, torch_loaded, cv2_loaded = measure_import(module, args.repeats)
+        results[module] = {
+            'import_ms': round(seconds * 1000, 2),
+            'torch_loaded': torch_loaded,
+            'cv2_loaded': cv2_loaded,
+        }
+        print(f"{module:15s} {seconds * 1000:8.2f} ms  torch={torch_loaded}  cv2={cv2_loaded}")
+    print(f"Benchmark finished in {round(time.perf_counter() - start, 2)} seconds")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == "__main__":
+    main()
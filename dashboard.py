@@ -151,6 +151,12 @@ def display_dashboard_results(data, file_id):
    
     st.markdown(f"<p class='analysis-id-text'>-- Latest Analysis ID: <span>{file_id}</span> --</p>", unsafe_allow_html=True)
     
+    if data.get('estimated'):
+        estimate = data.get('metadata', {}).get('estimate', {})
+        sampled = estimate.get('sampled_fraction')
+        sampled_text = f" from {round(sampled * 100, 1)}% of the video" if isinstance(sampled, (int, float)) else ""
+        st.warning(f"Quick estimate: counts are extrapolated{sampled_text} ({int(estimate.get('confidence', 0.95) * 100)}% intervals in the JSON report).")
+    
     st.markdown("<br>", unsafe_allow_html=True)
     
    
@@ -179,7 +185,13 @@ def display_dashboard_results(data, file_id):
     
     if 'total_objects_per_class' in data and 'all_tracked_objects' in data:
         
-        total_unique_vehicles = len(data.get('all_tracked_objects', []))
+        if data.get('estimated'):
+            # Sampled windows only list the tracks they saw; the extrapolated total is in the counts.
+            vehicles_label = "Estimated Total Vehicles"
+            total_unique_vehicles = sum(data['total_objects_per_class'].values())
+        else:
+            vehicles_label = "Total Unique Vehicles"
+            total_unique_vehicles = len(data.get('all_tracked_objects', []))
         frames_processed = data.get('metadata', {}).get('total_frames', 'N/A')
         video_fps = data.get('metadata', {}).get('video_fps', 'N/A')
         time_taken = data.get('metadata', {}).get('analysis_time_seconds', 'N/A')
@@ -194,7 +206,7 @@ def display_dashboard_results(data, file_id):
         col1, col2, col3, col4 = st.columns(4)
 
         with col1:
-            st.metric("Total Unique Vehicles", total_unique_vehicles, delta_color="normal")
+            st.metric(vehicles_label, total_unique_vehicles, delta_color="normal")
         with col2:
             st.metric("Frames Processed", frames_processed, delta_color="normal")
         with col3:
@@ -1,27 +1,74 @@
-from ultralytics import YOLO
+import threading
 import numpy as np
 
+# Process-wide model registry: each weights file is loaded once and shared by
+# every Detector, so repeated run_analysis calls skip the model load.
+# The ultralytics predictor is not thread-safe, so every model has its own
+# lock and Detector.detect holds it for the whole inference call: concurrent
+# jobs share the model but their detections run one at a time.
+_MODEL_REGISTRY = {}
+_MODEL_LOCKS = {}
+_MODEL_REGISTRY_LOCK = threading.Lock()
+
+
+def get_model(model_path='yolov8n.pt'):
+    """Returns the cached YOLO model for model_path, loading it on first use."""
+    model = _MODEL_REGISTRY.get(model_path)
+    if model is not None:
+        return model
+
+    with _MODEL_REGISTRY_LOCK:
+        model = _MODEL_REGISTRY.get(model_path)
+        if model is None:
+            # Imported here so that importing this module never pulls in torch.
+            from ultralytics import YOLO
+            model = YOLO(model_path)
+            _MODEL_REGISTRY[model_path] = model
+            _MODEL_LOCKS[model_path] = threading.Lock()
+    return model
+
+
+def get_model_lock(model_path='yolov8n.pt'):
+    """Returns the lock that serializes inference on the cached model for model_path."""
+    get_model(model_path)
+    return _MODEL_LOCKS[model_path]
+
+
+def clear_model_registry():
+    """Drops all cached models (e.g. to free GPU memory)."""
+    with _MODEL_REGISTRY_LOCK:
+        _MODEL_REGISTRY.clear()
+        _MODEL_LOCKS.clear()
+
+
 class Detector:
     def __init__(self, model_path='yolov8n.pt'):
-        """Initializes the YOLO model."""
-        self.model = YOLO(model_path)
+        """Initializes the YOLO model (shared through the model registry)."""
+        self.model = get_model(model_path)
+        self._model_lock = get_model_lock(model_path)
         self.class_names = self.model.names 
         print(f"Detector initialized with {len(self.class_names)} classes.")
 
-    def detect(self, frame):
+    def detect(self, frame, imgsz=None):
         """
-        Runs detection on a frame.
+        Runs detection on a frame (optionally at a reduced inference size).
+        Thread-safe: calls on the same shared model are serialized.
         Returns: numpy array of detections in format: [x1, y1, x2, y2, conf, cls]
         """
         
-        results = self.model(frame, verbose=False)[0] 
-        
-        
+        with self._model_lock:
+            if imgsz is None:
+                results = self.model(frame, verbose=False)[0] 
+            else:
+                results = self.model(frame, imgsz=imgsz, verbose=False)[0]
+            
+            
 
-        if results.boxes is not None and results.boxes.data is not None:
-            boxes = results.boxes.data.cpu().numpy()
-            if boxes.size > 0:
-                 return boxes
+            if results.boxes is not None and results.boxes.data is not None:
+                boxes = results.boxes.data.cpu().numpy()
+                if boxes.size > 0:
+                     return boxes
         
         
         return np.empty((0, 6), dtype=np.float32)
+
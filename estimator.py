@@ -0,0 +1,220 @@
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from detector import Detector
+from tracker import Tracker
+from analyser import Analyser
+from reid import ReIdCache
+from utils import save_reports
+
+SPEED_PERCENTILES = (10, 50, 85, 95)
+
+
+def plan_windows(total_frames, window_frames, sample_fraction, strategy='stratified', min_windows=3, seed=None):
+    """
+    Picks the start frames of the windows to analyse.
+    'stratified' draws one window at a random offset inside each of n equal
+    slices of the video; 'random' draws n distinct aligned windows.
+    """
+    if window_frames >= total_frames:
+        return [0]
+
+    population = total_frames // window_frames
+    n = max(min(min_windows, population), math.ceil(sample_fraction * population))
+    n = min(n, population)
+    rng = np.random.default_rng(seed)
+
+    if strategy == 'random':
+        picks = rng.choice(population, size=n, replace=False)
+        return sorted(int(i) * window_frames for i in picks)
+    if strategy != 'stratified':
+        raise ValueError(f"Unknown sampling strategy '{strategy}'. Use 'stratified' or 'random'.")
+
+    starts = []
+    stratum = total_frames / n
+    for i in range(n):
+        low = int(i * stratum)
+        high = max(low, int((i + 1) * stratum) - window_frames)
+        starts.append(int(rng.integers(low, high + 1)))
+    return starts
+
+
+def _analyse_window(video_path, start_frame, window_frames, warmup_frames, model_path, reid_window, reid_appearance):
+    """
+    Runs Detector -> Tracker -> Analyser on one window. The first warmup_frames
+    only prime the tracker: objects already present then are not counted, so
+    counts are entries per second of the counted part.
+    """
+    import cv2
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video file at {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+    detector = Detector(model_path=model_path)
+    reid = ReIdCache(merge_window=reid_window, use_appearance=reid_appearance) if reid_window else None
+    tracker = Tracker(max_coast_frames=5 if reid is not None else None)
+    analyser = Analyser(detector.class_names, fps=fps, reid=reid)
+
+    frames_read = 0
+    frame_number = start_frame
+    while frames_read < window_frames:
+        ret, frame = cap.read()
+        if not ret: break
+        frames_read += 1
+        frame_number += 1
+        tracked_objects = tracker.update(detector.detect(frame), frame)
+        analyser.analyse_frame(tracked_objects, frame_number, frame)
+    cap.release()
+
+    count_from = start_frame + warmup_frames
+    counts = {name: 0 for name in detector.class_names.values()}
+    for data in analyser.tracked_objects_data.values():
+        if data.entry_frame > count_from:
+            counts[data.class_name] = counts.get(data.class_name, 0) + 1
+
+    tracks = [
+        t for t in analyser.get_final_report_data()['all_tracked_objects']
+        if t['entry_frame'] > count_from
+    ]
+    for t in tracks:
+        # Tracker IDs restart in every window; prefix them so they stay unique in the combined report.
+        t['track_id'] = f"{start_frame}:{t['track_id']}"
+    return {
+        "start_frame": start_frame,
+        "frames": frames_read,
+        "counted_seconds": max(0, frames_read - warmup_frames) / fps,
+        "counts": counts,
+        "tracks": tracks,
+        "speeds": [t['avg_speed_kph'] for t in tracks if t['avg_speed_kph'] > 0],
+    }
+
+
+def _estimate(windows, total_seconds, class_names, n_boot, confidence, seed):
+    """Ratio estimates of per-class totals and speed percentiles with bootstrap CIs over windows."""
+    counts = np.array([[w['counts'].get(c, 0) for c in class_names] for w in windows], dtype=float)
+    seconds = np.array([w['counted_seconds'] for w in windows], dtype=float)
+    speeds = [np.asarray(w['speeds'], dtype=float) for w in windows]
+
+    def totals(idx):
+        counted = seconds[idx].sum()
+        if counted <= 0:
+            return np.zeros(len(class_names))
+        return counts[idx].sum(axis=0) / counted * total_seconds
+
+    def percentiles(idx):
+        pooled = np.concatenate([speeds[i] for i in idx]) if len(idx) else np.empty(0)
+        if pooled.size == 0:
+            return np.full(len(SPEED_PERCENTILES), np.nan)
+        return np.percentile(pooled, SPEED_PERCENTILES)
+
+    all_idx = np.arange(len(windows))
+    point_totals = totals(all_idx)
+    point_speeds = percentiles(all_idx)
+
+    lower_q = (1 - confidence) / 2 * 100
+    upper_q = 100 - lower_q
+    if len(windows) > 1:
+        rng = np.random.default_rng(seed)
+        boot = [rng.integers(0, len(windows), size=len(windows)) for _ in range(n_boot)]
+        boot_totals = np.array([totals(idx) for idx in boot])
+        boot_speeds = np.array([percentiles(idx) for idx in boot])
+        totals_low, totals_high = np.percentile(boot_totals, [lower_q, upper_q], axis=0)
+        speeds_low, speeds_high = np.nanpercentile(boot_speeds, [lower_q, upper_q], axis=0)
+    else:
+        # A single window gives no spread to resample.
+        totals_low = totals_high = np.full(len(class_names), np.nan)
+        speeds_low = speeds_high = np.full(len(SPEED_PERCENTILES), np.nan)
+
+    def interval(value, low, high):
+        return {
+            "estimate": None if np.isnan(value) else round(float(value), 2),
+            "low": None if np.isnan(low) else round(float(low), 2),
+            "high": None if np.isnan(high) else round(float(high), 2),
+        }
+
+    counts_ci = {c: interval(point_totals[i], totals_low[i], totals_high[i]) for i, c in enumerate(class_names)}
+    speeds_ci = {
+        f"p{p}": interval(point_speeds[i], speeds_low[i], speeds_high[i])
+        for i, p in enumerate(SPEED_PERCENTILES)
+    }
+    return point_totals, counts_ci, speeds_ci
+
+
+def run_estimate(video_path: str, output_dir: str, file_id: str, sample_fraction: float = 0.1,
+                 window_seconds: float = 10.0, strategy: str = 'stratified', workers: int = 1,
+                 confidence: float = 0.95, seed: int = None, model_path: str = 'yolov8n.pt',
+                 reid_window: int = 45, reid_appearance: bool = True, n_boot: int = 1000) -> dict:
+    """
+    Quick-estimate counterpart of run_analysis: analyses only sampled windows of
+    the video (in parallel worker processes when workers > 1) and extrapolates
+    class counts and speed percentiles with bootstrap confidence intervals.
+    Returns and saves the normal report schema with "estimated": True.
+    """
+    import cv2
+
+    print(f"Estimating... Video: {video_path}")
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        raise IOError(f"Cannot open video file at {video_path}")
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+    if total_frames <= 0:
+        raise IOError(f"Cannot determine the frame count of {video_path}; use the full analysis instead.")
+
+    window_frames = max(1, int(window_seconds * fps))
+    warmup_frames = min(int(fps), window_frames // 4)
+    starts = plan_windows(total_frames, window_frames, sample_fraction, strategy, seed=seed)
+    print(f"Sampling {len(starts)} window(s) of {window_frames} frames ({strategy}).")
+
+    start_time = time.time()
+    jobs = [(video_path, s, window_frames, warmup_frames, model_path, reid_window, reid_appearance) for s in starts]
+    if workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            windows = list(pool.map(_analyse_window, *zip(*jobs)))
+    else:
+        windows = [_analyse_window(*job) for job in jobs]
+    end_time = time.time()
+
+    # Every detector class, in the detector's order, as in a full report.
+    class_names = list(dict.fromkeys(c for w in windows for c in w['counts']))
+    total_seconds = total_frames / fps
+    point_totals, counts_ci, speeds_ci = _estimate(windows, total_seconds, class_names, n_boot, confidence, seed)
+
+    final_data = {
+        "total_objects_per_class": {c: int(round(point_totals[i])) for i, c in enumerate(class_names)},
+        "all_tracked_objects": [t for w in windows for t in w['tracks']],
+        "estimated": True,
+    }
+    sampled_frames = sum(w['frames'] for w in windows)
+    final_data['metadata'] = {
+        'total_frames': sampled_frames,
+        'video_total_frames': total_frames,
+        'video_fps': fps,
+        'video_width': width,
+        'video_height': height,
+        'analysis_time_seconds': round(end_time - start_time, 2),
+        'estimate': {
+            'strategy': strategy,
+            'window_frames': window_frames,
+            'warmup_frames': warmup_frames,
+            'window_starts': starts,
+            'sampled_fraction': round(sampled_frames / total_frames, 4),
+            'confidence': confidence,
+            'counts_ci': counts_ci,
+            'speed_percentiles_kph': speeds_ci,
+        },
+    }
+
+    print(f"Estimate done in {round(end_time - start_time, 2)} seconds "
+          f"({final_data['metadata']['estimate']['sampled_fraction'] * 100:.1f}% of frames analysed).")
+    save_reports(final_data, fps, output_dir, file_id)
+    return final_data
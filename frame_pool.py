@@ -0,0 +1,99 @@
+import collections
+import threading
+
+import numpy as np
+
+
+class FrameBuffer:
+    """
+    One preallocated frame slot from a FramePool.
+
+    A buffer is handed out with one reference. A caller that passes the frame
+    to another holder calls retain() first, and every holder calls release()
+    when done; the slot goes back to the pool once the count drops to zero.
+    """
+
+    def __init__(self, pool, index, array):
+        self.pool = pool
+        self.index = index
+        self.array = array
+        self.frame_number = 0
+        self._refcount = 0
+
+    @property
+    def refcount(self):
+        return self._refcount
+
+    def retain(self):
+        with self.pool._cond:
+            if self._refcount <= 0:
+                raise RuntimeError(f"Frame buffer {self.index} retained after being released.")
+            self._refcount += 1
+        return self
+
+    def release(self):
+        with self.pool._cond:
+            if self._refcount <= 0:
+                raise RuntimeError(f"Frame buffer {self.index} released more times than retained.")
+            self._refcount -= 1
+            if self._refcount == 0:
+                self.pool._free.append(self)
+                self.pool._cond.notify()
+
+
+class FramePool:
+    """
+    A fixed set of preallocated frame buffers. Free buffers are handed out in
+    the order they were returned, so all of them are used in turn; size only
+    needs to exceed the number of frames held at once.
+    """
+
+    def __init__(self, shape, size=4, dtype=np.uint8):
+        if size < 1:
+            raise ValueError("FramePool size must be at least 1.")
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self._cond = threading.Condition()
+        self._buffers = [FrameBuffer(self, i, np.empty(self.shape, dtype=self.dtype)) for i in range(size)]
+        self._free = collections.deque(self._buffers)
+        # Frames the decoder could not write in place and had to be copied.
+        self.copies = 0
+
+    def __len__(self):
+        return len(self._buffers)
+
+    @property
+    def available(self):
+        with self._cond:
+            return len(self._free)
+
+    def acquire(self, timeout=None):
+        """Takes a free buffer (refcount 1), waiting until one is released."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._free, timeout=timeout):
+                raise TimeoutError("No free frame buffer available in the pool.")
+            buf = self._free.popleft()
+            buf._refcount = 1
+            return buf
+
+    def read(self, cap, frame_number=0, timeout=None):
+        """
+        Decodes the next frame of cap straight into a pooled buffer via
+        cap.read(image=...). Returns the FrameBuffer, or None at end of stream.
+        """
+        buf = self.acquire(timeout=timeout)
+        ret, image = cap.read(image=buf.array)
+        if not ret:
+            buf.release()
+            return None
+
+        if image is not buf.array and not np.shares_memory(image, buf.array):
+            # The decoder allocated a new image (e.g. size or dtype mismatch).
+            if image.shape != self.shape:
+                buf.release()
+                raise ValueError(f"Decoded frame shape {image.shape} does not match pool shape {self.shape}.")
+            np.copyto(buf.array, image)
+            self.copies += 1
+
+        buf.frame_number = frame_number
+        return buf
@@ -0,0 +1,142 @@
+import collections
+import numpy as np
+
+
+def color_histogram(frame, box, bins=4, step=4):
+    """
+    Tiny appearance descriptor: a normalized bins^3 BGR histogram of the box
+    crop, subsampled every `step` pixels so it costs a few microseconds.
+    """
+    height, width = frame.shape[:2]
+    x1, y1, x2, y2 = box
+    x1, y1 = max(0, int(x1)), max(0, int(y1))
+    x2, y2 = min(width, int(x2)), min(height, int(y2))
+    if x2 <= x1 or y2 <= y1:
+        return None
+
+    crop = frame[y1:y2:step, x1:x2:step].reshape(-1, 3)
+    q = (crop.astype(np.uint16) * bins) >> 8
+    index = (q[:, 0] * bins + q[:, 1]) * bins + q[:, 2]
+    hist = np.bincount(index, minlength=bins ** 3).astype(np.float32)
+    return hist / hist.sum()
+
+
+def histogram_similarity(a, b):
+    """Histogram intersection in [0, 1] (1 = identical colour distribution)."""
+    return float(np.minimum(a, b).sum())
+
+
+class LostTrack:
+    """Last known state of a track that disappeared from the tracker output."""
+
+    def __init__(self, track_id, class_name, x, y, vx, vy, size, lost_frame, descriptor=None):
+        self.track_id = track_id
+        self.class_name = class_name
+        self.x = x
+        self.y = y
+        self.vx = vx
+        self.vy = vy
+        self.size = size
+        self.lost_frame = lost_frame
+        self.descriptor = descriptor
+
+    def predict(self, frame_number):
+        """Constant-velocity extrapolation of the centre to frame_number."""
+        gap = frame_number - self.lost_frame
+        return self.x + self.vx * gap, self.y + self.vy * gap
+
+
+class ReIdCache:
+    """
+    Bounded cache of recently lost tracks used to re-identify objects that the
+    tracker gives a new ID after an occlusion.
+
+    A new track is merged into a cached one of the same class if it appears
+    within merge_window frames close to the cached track's motion-extrapolated
+    position (gate grows with the object size and the gap). With
+    use_appearance, both tracks must also have similar colour histograms.
+    """
+
+    def __init__(self, merge_window=45, max_size=256, distance_factor=1.0, min_distance_px=30,
+                 use_appearance=False, min_similarity=0.5, descriptor_every=5):
+        self.merge_window = merge_window
+        self.max_size = max_size
+        self.distance_factor = distance_factor
+        self.min_distance_px = min_distance_px
+        self.use_appearance = use_appearance
+        self.min_similarity = min_similarity
+        self.descriptor_every = descriptor_every
+
+        self._lost = collections.OrderedDict()
+        self.lookups = 0
+        self.merges = 0
+
+    def __len__(self):
+        return len(self._lost)
+
+    def add(self, obj_data):
+        """Caches a track (an analyser.ObjectData) that is no longer reported."""
+        path = obj_data.path
+        if not path:
+            return
+        x, y, t = path[-1]
+        x0, y0, t0 = path[0]
+        if t > t0:
+            vx, vy = (x - x0) / (t - t0), (y - y0) / (t - t0)
+        else:
+            vx = vy = 0.0
+
+        self._lost.pop(obj_data.id, None)
+        self._lost[obj_data.id] = LostTrack(
+            obj_data.id, obj_data.class_name, x, y, vx, vy,
+            obj_data.box_size, t, obj_data.descriptor,
+        )
+        while len(self._lost) > self.max_size:
+            self._lost.popitem(last=False)
+
+    def discard(self, track_id):
+        self._lost.pop(track_id, None)
+
+    def expire(self, frame_number):
+        """Drops tracks lost for longer than merge_window (oldest first)."""
+        while self._lost:
+            track_id, lost = next(iter(self._lost.items()))
+            if frame_number - lost.lost_frame <= self.merge_window:
+                break
+            del self._lost[track_id]
+
+    def match(self, class_name, x, y, size, frame_number, descriptor=None):
+        """
+        Returns the ID of the cached track the new observation belongs to (and
+        removes it from the cache), or None if it looks like a new object.
+        """
+        self.lookups += 1
+        best_id, best_score = None, None
+
+        for track_id, lost in self._lost.items():
+            if lost.class_name != class_name:
+                continue
+            gap = frame_number - lost.lost_frame
+            if gap <= 0 or gap > self.merge_window:
+                continue
+
+            px, py = lost.predict(frame_number)
+            gate = max(self.min_distance_px, self.distance_factor * max(size, lost.size))
+            gate *= 1.0 + gap / self.merge_window
+            score = np.hypot(x - px, y - py) / gate
+            if score > 1.0:
+                continue
+
+            if self.use_appearance and descriptor is not None and lost.descriptor is not None:
+                similarity = histogram_similarity(descriptor, lost.descriptor)
+                if similarity < self.min_similarity:
+                    continue
+                score += 1.0 - similarity
+
+            if best_score is None or score < best_score:
+                best_id, best_score = track_id, score
+
+        if best_id is not None:
+            del self._lost[best_id]
+            self.merges += 1
+        return best_id
@@ -0,0 +1,73 @@
+import argparse
+import glob
+import json
+import os
+
+# Lightweight, report-only entry point. Only the standard library is used here
+# so reading results never imports cv2, torch or ultralytics.
+
+
+def find_latest_report(output_dir="output"):
+    """Returns the path of the newest *_results.json file, or None."""
+    list_of_files = glob.glob(os.path.join(output_dir, '*_results.json'))
+    if not list_of_files:
+        return None
+    return max(list_of_files, key=os.path.getctime)
+
+
+def load_report(json_path):
+    """Loads a results JSON written by run_analysis."""
+    with open(json_path, 'r') as f:
+        return json.load(f)
+
+
+def summarize_report(data):
+    """Builds a compact summary dict from a loaded report."""
+    counts = {name: n for name, n in data.get('total_objects_per_class', {}).items() if n > 0}
+    tracked = data.get('all_tracked_objects', [])
+    metadata = data.get('metadata', {})
+
+    avg_speeds = [obj['avg_speed_kph'] for obj in tracked if obj.get('avg_speed_kph', 0) > 0]
+    max_speeds = [obj['max_speed_kph'] for obj in tracked if obj.get('max_speed_kph', 0) > 0]
+
+    return {
+        'counts_per_class': counts,
+        'total_counted': sum(counts.values()),
+        'tracked_objects': len(tracked),
+        'mean_avg_speed_kph': round(sum(avg_speeds) / len(avg_speeds), 2) if avg_speeds else 0.0,
+        'top_speed_kph': round(max(max_speeds), 2) if max_speeds else 0.0,
+        'estimated': data.get('estimated', False),
+        'metadata': metadata,
+    }
+
+
+def main_cli():
+    """Prints a summary of a saved report without loading any model."""
+    parser = argparse.ArgumentParser(description="Realtime Counting Analyser (Report Viewer)")
+    parser.add_argument('report', nargs='?', default=None, help='Path to a *_results.json file (defaults to the latest one).')
+    parser.add_argument('--output-dir', type=str, default='output', help='Directory to search for the latest report.')
+    parser.add_argument('--json', action='store_true', help='Print the summary as JSON.')
+
+    args = parser.parse_args()
+
+    json_path = args.report or find_latest_report(args.output_dir)
+    if json_path is None:
+        print(f"No analysis results found in '{args.output_dir}'.")
+        return
+
+    summary = summarize_report(load_report(json_path))
+
+    if args.json:
+        print(json.dumps(summary, indent=4))
+        return
+
+    print(f"Report: {json_path}{' (quick estimate)' if summary['estimated'] else ''}")
+    print(f"Total counted: {summary['total_counted']} ({summary['tracked_objects']} tracked objects)")
+    for name, n in sorted(summary['counts_per_class'].items(), key=lambda kv: -kv[1]):
+        print(f"  - {name}: {n}")
+    print(f"Mean avg speed: {summary['mean_avg_speed_kph']} km/h")
+    print(f"Top speed: {summary['top_speed_kph']} km/h")
+
+
+if __name__ == "__main__":
+    main_cli()
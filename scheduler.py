@@ -0,0 +1,178 @@
+import threading
+import time
+
+# Degradation steps, applied cumulatively in this order when the node falls
+# behind real time. The last one is node-wide: new jobs are refused.
+LEVELS = [
+    'full_quality',
+    'skip_rendering',
+    'reduced_inference_resolution',
+    'increased_detection_stride',
+    'refusing_new_jobs',
+]
+LEVEL_REFUSE = len(LEVELS) - 1
+
+
+class NodeOverloadedError(RuntimeError):
+    """Raised when the node is shedding load and does not accept new jobs."""
+
+
+class StreamSettings:
+    """Processing settings a stream should use at the current degradation level."""
+
+    def __init__(self, level, reduced_imgsz, degraded_stride):
+        self.level = level
+        self.render = level < 1
+        self.imgsz = reduced_imgsz if level >= 2 else None
+        self.detect_stride = degraded_stride if level >= 3 else 1
+
+
+class StreamLoad:
+    """Per-stream handle: measures processing FPS and records every degradation."""
+
+    def __init__(self, scheduler, job_id, source_fps):
+        self.scheduler = scheduler
+        self.job_id = job_id
+        self.source_fps = source_fps or 30.0
+        self.processing_fps = None
+        self.degradations = []
+        self.max_level = 0
+
+        self._window_start = scheduler.clock()
+        self._window_frames = 0
+        self._level = None
+        self.settings = None
+        self._apply_level(scheduler.level, frame_number=0)
+
+    @property
+    def ratio(self):
+        """Processing FPS relative to source FPS (>= 1 means keeping up)."""
+        if self.processing_fps is None:
+            return None
+        return self.processing_fps / self.source_fps
+
+    def _apply_level(self, level, frame_number):
+        # A running stream never degrades past the last per-stream step.
+        level = min(level, LEVEL_REFUSE - 1)
+        if level == self._level:
+            return
+        # Level changes are recorded, and so is a degraded starting level, so
+        # every frame's quality can be read off the list.
+        if self._level is not None or level > 0:
+            self.degradations.append({
+                "frame": frame_number,
+                "level": level,
+                "mode": LEVELS[level],
+                "processing_fps": round(self.processing_fps, 2) if self.processing_fps else None,
+                "source_fps": round(self.source_fps, 2),
+                "timestamp": round(time.time(), 3),
+            })
+        self._level = level
+        self.max_level = max(self.max_level, level)
+        self.settings = StreamSettings(level, self.scheduler.reduced_imgsz, self.scheduler.degraded_stride)
+
+    def tick(self, frame_number):
+        """Call once per processed frame; returns the StreamSettings to use next."""
+        self._window_frames += 1
+        if self._window_frames >= self.scheduler.window_frames:
+            now = self.scheduler.clock()
+            elapsed = now - self._window_start
+            if elapsed > 0:
+                self.processing_fps = self._window_frames / elapsed
+            self._window_start = now
+            self._window_frames = 0
+            self.scheduler._update()
+        self._apply_level(self.scheduler.level, frame_number)
+        return self.settings
+
+    def metadata(self):
+        """Quality information to attach to the job's report metadata."""
+        return {
+            "final_level": self._level,
+            "final_mode": LEVELS[self._level],
+            "max_level": self.max_level,
+            "max_mode": LEVELS[self.max_level],
+            "degraded": self.max_level > 0,
+            "degradations": list(self.degradations),
+        }
+
+    def close(self):
+        self.scheduler.close_stream(self)
+
+
+class LoadScheduler:
+    """
+    Node-wide load shedder.
+
+    Every stream reports its processing FPS over a window of frames. Load is
+    only shed under contention: while at least min_streams streams are
+    running and the slowest falls below overload_ratio x its source FPS, the
+    node steps one level down the LEVELS ladder. A single job that is slower
+    than real time is left at full quality, since nothing else competes for
+    the CPU. The node steps back up when every stream is comfortably above
+    recover_ratio, or when contention ends. cooldown_s is the minimum time
+    between two level changes, so a new level gets time to take effect before
+    the next one. clock is a monotonic time source in seconds.
+    """
+
+    def __init__(self, overload_ratio=0.9, recover_ratio=1.3, window_frames=30, cooldown_s=5.0,
+                 reduced_imgsz=416, degraded_stride=2, min_streams=2, clock=time.monotonic):
+        self.overload_ratio = overload_ratio
+        self.recover_ratio = recover_ratio
+        self.window_frames = window_frames
+        self.cooldown_s = cooldown_s
+        self.reduced_imgsz = reduced_imgsz
+        self.degraded_stride = degraded_stride
+        self.min_streams = min_streams
+        self.clock = clock
+
+        self.level = 0
+        self._streams = {}
+        self._last_change = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def mode(self):
+        return LEVELS[self.level]
+
+    def check_admission(self):
+        """Raises NodeOverloadedError if the node is currently refusing new jobs."""
+        if self.level >= LEVEL_REFUSE:
+            raise NodeOverloadedError(
+                f"Node overloaded ({len(self._streams)} active streams); not accepting new jobs."
+            )
+
+    def open_stream(self, job_id, source_fps):
+        """Registers a new stream, or raises NodeOverloadedError."""
+        with self._lock:
+            self.check_admission()
+            stream = StreamLoad(self, job_id, source_fps)
+            self._streams[job_id] = stream
+            return stream
+
+    def close_stream(self, stream):
+        with self._lock:
+            self._streams.pop(stream.job_id, None)
+            if not self._streams:
+                # Nothing left to measure; start the next job at full quality.
+                self.level = 0
+
+    def _update(self):
+        with self._lock:
+            ratios = [s.ratio for s in self._streams.values() if s.ratio is not None]
+            if not ratios:
+                return
+            now = self.clock()
+            if now - self._last_change < self.cooldown_s:
+                return
+
+            worst = min(ratios)
+            contended = len(self._streams) >= self.min_streams
+            if contended and worst < self.overload_ratio and self.level < LEVEL_REFUSE:
+                self.level += 1
+                self._last_change = now
+                print(f"Load shedding: {len(self._streams)} streams, slowest at {worst:.2f}x real time -> {self.mode}")
+            elif self.level > 0 and (not contended or worst > self.recover_ratio):
+                self.level -= 1
+                self._last_change = now
+                print(f"Load recovered: {len(self._streams)} streams, slowest at {worst:.2f}x real time -> {self.mode}")
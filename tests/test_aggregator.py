@@ -0,0 +1,153 @@
+import pytest
+
+from aggregator import RollupAggregator, StreamFeed, speed_bin_label
+from analyser import Analyser, MIN_REPORTED_FRAMES
+from reid import ReIdCache
+
+CLASS_NAMES = {2: 'car', 7: 'truck'}
+# 10:00:59 on day 0, so a track entering 1 s in lands in the next minute.
+START = 10 * 3600 + 59
+
+
+def box(cx, cy, track_id, class_id=2, half=15):
+    return [cx - half, cy - half, cx + half, cy + half, track_id, class_id]
+
+
+def track(entry_frame, class_name='car', frames=20, speed=50.0):
+    return {
+        "track_id": entry_frame,
+        "class_name": class_name,
+        "entry_frame": entry_frame,
+        "exit_frame": entry_frame + frames,
+        "total_frames_tracked": frames,
+        "avg_speed_kph": speed,
+        "max_speed_kph": speed + 5,
+        "path_length": min(frames, 10),
+    }
+
+
+@pytest.fixture
+def agg():
+    aggregator = RollupAggregator()
+    yield aggregator
+    aggregator.close()
+
+
+def totals(rows):
+    out = {}
+    for row in rows:
+        out[row['class_name']] = out.get(row['class_name'], 0) + row['count']
+    return out
+
+
+def test_buckets_split_on_entry_time(agg):
+    # 15 frames = 0.5 s (same minute), 40 frames = 1.33 s (next minute) at 30 fps.
+    agg.ingest_tracks("north", "cam-1", [track(15), track(40)], START, fps=30)
+
+    rows = agg.query_counts('1m')
+    assert [(r['bucket_start'], r['count']) for r in rows] == [(START - 59, 1), (START + 1, 1)]
+    assert agg.query_counts('1h')[0]['count'] == 2
+
+
+def test_repeated_ingest_accumulates(agg):
+    agg.ingest_tracks("north", "cam-1", [track(15, speed=40.0)], START, fps=30)
+    agg.ingest_tracks("north", "cam-1", [track(20, speed=60.0)], START, fps=30)
+
+    (row,) = agg.query_counts('1h')
+    assert row['count'] == 2
+    assert row['avg_speed_kph'] == 50.0
+    assert row['max_speed_kph'] == 65.0
+
+
+def test_speeds_only_use_reported_tracks(agg):
+    short = track(15, frames=MIN_REPORTED_FRAMES, speed=120.0)
+    agg.ingest_tracks("north", "cam-1", [short, track(20, speed=45.0)], START, fps=30)
+
+    (row,) = agg.query_counts('1h')
+    assert row['count'] == 2
+    assert row['avg_speed_kph'] == 45.0
+    assert row['max_speed_kph'] == 50.0
+    hist = agg.query_speed_distribution('1h')
+    assert sum(hist.values()) == 1
+    assert hist[speed_bin_label(4)] == 1
+
+
+def test_grouping_per_camera_per_site_and_overall(agg):
+    agg.ingest_tracks("north", "cam-1", [track(10), track(12)], START, fps=30)
+    agg.ingest_tracks("north", "cam-2", [track(14)], START, fps=30)
+    agg.ingest_tracks("south", "cam-1", [track(16, 'truck')], START, fps=30)
+
+    per_camera = agg.query_counts('1h', per_camera=True)
+    assert [(r['site'], r['camera'], r['class_name'], r['count']) for r in per_camera] == [
+        ("north", "cam-1", "car", 2), ("north", "cam-2", "car", 1), ("south", "cam-1", "truck", 1),
+    ]
+
+    per_site = agg.query_counts('1h', per_site=True)
+    assert [(r['site'], r['class_name'], r['count']) for r in per_site] == [
+        ("north", "car", 3), ("south", "truck", 1),
+    ]
+    assert all('camera' not in r for r in per_site)
+
+    assert totals(agg.query_counts('1h')) == {"car": 3, "truck": 1}
+    assert totals(agg.query_counts('1h', site="north")) == {"car": 3}
+    assert agg.list_streams() == [
+        {"site": "north", "camera": "cam-1"}, {"site": "north", "camera": "cam-2"}, {"site": "south", "camera": "cam-1"},
+    ]
+
+
+def test_unknown_resolution_is_rejected(agg):
+    with pytest.raises(ValueError):
+        agg.query_counts('5m')
+
+
+def feed_scene(analyser, feed, frames):
+    for frame_number, rows in enumerate(frames, start=1):
+        analyser.analyse_frame(rows, frame_number)
+        feed.poll(frame_number)
+    feed.flush(len(frames))
+
+
+def test_stream_feed_counts_match_the_job_report(agg):
+    analyser = Analyser(CLASS_NAMES, fps=30)
+    feed = StreamFeed(agg, analyser, "north", "cam-1", stream_start_time=START)
+
+    frames = [[] for _ in range(120)]
+    for f in range(0, 30):
+        frames[f].append(box(50 + 4 * f, 100, 1))
+    for f in range(10, 14):
+        # Too short for all_tracked_objects, but still counted.
+        frames[f].append(box(300, 300, 2, class_id=7))
+    for f in range(60, 100):
+        frames[f].append(box(50 + 2 * f, 200, 3))
+    feed_scene(analyser, feed, frames)
+
+    report = analyser.get_final_report_data()
+    assert totals(agg.query_counts('1h')) == report['total_objects_per_class'] == {"car": 2, "truck": 1}
+    assert totals(agg.query_counts('1m')) == report['total_objects_per_class']
+    assert feed.ingested == 3
+    assert sum(agg.query_speed_distribution('1h').values()) == len(report['all_tracked_objects']) == 2
+
+
+def test_stream_feed_waits_for_the_reid_merge_window(agg):
+    analyser = Analyser(CLASS_NAMES, fps=30, reid=ReIdCache(merge_window=45))
+    feed = StreamFeed(agg, analyser, "north", "cam-1", stream_start_time=START)
+    assert feed.idle_frames == 45
+
+    # Track 1 is occluded for 40 frames (past the tracker's 30), then comes back as ID 2.
+    frames = [[] for _ in range(100)]
+    for f in range(0, 20):
+        frames[f].append(box(50 + 4 * f, 100, 1))
+    for f in range(60, 80):
+        frames[f].append(box(50 + 4 * f, 100, 2))
+    for frame_number, rows in enumerate(frames, start=1):
+        analyser.analyse_frame(rows, frame_number)
+        feed.poll(frame_number)
+        if frame_number == 60:
+            assert feed.ingested == 0
+    feed.flush(len(frames))
+
+    report = analyser.get_final_report_data()
+    assert report['total_objects_per_class'] == {"car": 1, "truck": 0}
+    (row,) = agg.query_counts('1h')
+    assert row['count'] == 1
+    assert row['avg_speed_kph'] == report['all_tracked_objects'][0]['avg_speed_kph']
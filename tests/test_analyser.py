@@ -0,0 +1,81 @@
+from analyser import Analyser
+from reid import ReIdCache
+
+CLASS_NAMES = {2: 'car'}
+
+
+def box(cx, cy, track_id, half=15):
+    return [cx - half, cy - half, cx + half, cy + half, track_id, 2]
+
+
+def occlude(analyser, frames):
+    for f in frames:
+        analyser.analyse_frame([], f)
+
+
+def test_reid_merges_track_after_occlusion():
+    analyser = Analyser(CLASS_NAMES, fps=30, reid=ReIdCache(merge_window=30))
+    for f in range(1, 16):
+        analyser.analyse_frame([box(100 + 4 * f, 125, 1)], f)
+    # Lost for 5 frames, then back under a new tracker ID near the predicted spot.
+    occlude(analyser, range(16, 21))
+    out = analyser.analyse_frame([box(100 + 4 * 21, 125, 2)], 21)
+
+    assert out[0][4] == 1
+    assert analyser.total_counts['car'] == 1
+
+
+def test_original_id_returning_while_alias_active_is_not_merged():
+    analyser = Analyser(CLASS_NAMES, fps=30, reid=ReIdCache(merge_window=30))
+    for f in range(1, 16):
+        analyser.analyse_frame([box(100 + 4 * f, 125, 1)], f)
+    occlude(analyser, range(16, 21))
+    for f in range(21, 25):
+        analyser.analyse_frame([box(100 + 4 * f, 125, 2)], f)
+    assert analyser.total_counts['car'] == 1
+
+    # Tracker ID 1 reappears elsewhere while ID 2 (merged into 1) is still active.
+    for order in ([box(425, 425, 1), box(200, 125, 2)], [box(204, 125, 2), box(425, 429, 1)]):
+        f += 1
+        out = analyser.analyse_frame(order, f)
+        ids = [row[4] for row in out]
+        assert len(set(ids)) == 2
+
+    assert analyser.total_counts['car'] == 2
+    track_1 = analyser.tracked_objects_data[1]
+    assert all(x > 300 for x, y, t in track_1.path if t > 24)
+    assert 2 in analyser.tracked_objects_data
+    assert all(y == 125 for x, y, t in analyser.tracked_objects_data[2].path)
+
+
+def test_new_id_not_merged_into_original_present_in_same_frame():
+    analyser = Analyser(CLASS_NAMES, fps=30, reid=ReIdCache(merge_window=30))
+    for f in range(1, 16):
+        analyser.analyse_frame([box(100 + 4 * f, 125, 1)], f)
+    occlude(analyser, range(16, 20))
+    # Both the new ID (at the predicted spot) and the original come back together.
+    out = analyser.analyse_frame([box(100 + 4 * 20, 125, 7), box(500, 500, 1)], 20)
+
+    assert sorted(row[4] for row in out) == [1, 7]
+    assert analyser.total_counts['car'] == 2
+
+
+def test_returning_alias_takes_its_track_out_of_the_cache():
+    analyser = Analyser(CLASS_NAMES, fps=30, reid=ReIdCache(merge_window=30))
+    for f in range(1, 16):
+        analyser.analyse_frame([box(100 + 4 * f, 125, 1)], f)
+    occlude(analyser, range(16, 21))
+    for f in range(21, 25):
+        analyser.analyse_frame([box(100 + 4 * f, 125, 2)], f)
+    # ID 2 (merged into 1) coasts, so track 1 is cached again.
+    occlude(analyser, range(25, 28))
+
+    # ID 2 comes back together with a new ID right next to it.
+    out = analyser.analyse_frame([box(100 + 4 * 28, 125, 2), box(100 + 4 * 28, 150, 3)], 28)
+    assert sorted(row[4] for row in out) == [1, 3]
+    assert analyser.total_counts['car'] == 2
+
+    # Track 1 is live again, so a later new ID nearby is a new object too.
+    out = analyser.analyse_frame([box(100 + 4 * 29, 125, 2), box(100 + 4 * 29, 100, 4)], 29)
+    assert sorted(row[4] for row in out) == [1, 4]
+    assert analyser.total_counts['car'] == 3
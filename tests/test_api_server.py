@@ -0,0 +1,56 @@
+import importlib
+import threading
+
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("httpx")
+from fastapi.testclient import TestClient
+
+from scheduler import LEVEL_REFUSE
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    # api_server creates uploads/ and output/ relative to the working directory.
+    monkeypatch.chdir(tmp_path)
+    import api_server
+    return importlib.reload(api_server)
+
+
+def test_upload_during_overloaded_run_gets_503(api, monkeypatch):
+    started = threading.Event()
+    finish = threading.Event()
+
+    def fake_run_analysis(video_path, output_dir, file_id, scheduler=None, **kwargs):
+        stream = scheduler.open_stream(file_id, 30.0)
+        try:
+            # Simulate the node falling behind while this job is running.
+            scheduler.level = LEVEL_REFUSE
+            stream.tick(1)
+            started.set()
+            assert finish.wait(timeout=10)
+        finally:
+            stream.close()
+        return {"total_objects_per_class": {"car": 1}, "metadata": {"quality": stream.metadata()}}
+
+    monkeypatch.setattr(api, "run_analysis", fake_run_analysis)
+    client = TestClient(api.app)
+
+    first = {}
+
+    def upload_first():
+        first["response"] = client.post("/analyze-video", files={"video_file": ("a.mp4", b"x" * 16)})
+
+    worker = threading.Thread(target=upload_first)
+    worker.start()
+    try:
+        assert started.wait(timeout=10)
+        second = client.post("/analyze-video", files={"video_file": ("b.mp4", b"x" * 16)})
+        assert second.status_code == 503
+    finally:
+        finish.set()
+        worker.join(timeout=10)
+
+    assert first["response"].status_code == 200
+    assert first["response"].json()["quality"]["max_level"] == LEVEL_REFUSE - 1
@@ -0,0 +1,67 @@
+import pytest
+
+from estimator import SPEED_PERCENTILES, _estimate, plan_windows
+
+
+def test_window_longer_than_video_analyses_it_once():
+    assert plan_windows(100, 300, 0.1) == [0]
+
+
+def test_stratified_windows_fall_in_their_own_slice():
+    total, window = 9000, 300
+    starts = plan_windows(total, window, 0.1, seed=1)
+
+    # 10% of 30 possible windows.
+    assert len(starts) == 3
+    for i, start in enumerate(starts):
+        assert i * 3000 <= start and start + window <= (i + 1) * 3000
+    assert plan_windows(total, window, 0.1, seed=1) == starts
+
+
+def test_random_windows_are_distinct_and_aligned():
+    starts = plan_windows(9000, 300, 0.2, strategy='random', seed=3)
+
+    assert len(starts) == 6
+    assert starts == sorted(set(starts))
+    assert all(s % 300 == 0 and s + 300 <= 9000 for s in starts)
+
+
+def test_small_fractions_still_sample_min_windows():
+    assert len(plan_windows(9000, 300, 0.001, seed=0)) == 3
+    assert len(plan_windows(600, 300, 0.001, seed=0)) == 2
+
+
+def test_unknown_strategy_is_rejected():
+    with pytest.raises(ValueError):
+        plan_windows(9000, 300, 0.1, strategy='systematic')
+
+
+def window(counts, seconds, speeds):
+    return {"counts": counts, "counted_seconds": seconds, "speeds": speeds}
+
+
+def test_ratio_estimate_and_bootstrap_interval():
+    windows = [
+        window({"car": 5, "truck": 0}, 10.0, [30.0, 40.0]),
+        window({"car": 15, "truck": 0}, 10.0, [50.0, 60.0]),
+    ]
+    totals, counts_ci, speeds_ci = _estimate(windows, 100.0, ["car", "truck"], n_boot=200, confidence=0.9, seed=0)
+
+    # 20 cars in 20 counted seconds -> 100 in 100 s.
+    assert list(totals) == [100.0, 0.0]
+    car = counts_ci["car"]
+    assert car["estimate"] == 100.0
+    # Resampling two windows can only give 50, 100 or 150.
+    assert 50.0 <= car["low"] <= car["estimate"] <= car["high"] <= 150.0
+    assert counts_ci["truck"] == {"estimate": 0.0, "low": 0.0, "high": 0.0}
+
+    assert set(speeds_ci) == {f"p{p}" for p in SPEED_PERCENTILES}
+    assert speeds_ci["p50"]["estimate"] == 45.0
+    assert 30.0 <= speeds_ci["p50"]["low"] <= speeds_ci["p50"]["high"] <= 60.0
+
+
+def test_single_window_has_no_interval():
+    totals, counts_ci, speeds_ci = _estimate([window({"car": 4}, 8.0, [])], 80.0, ["car"], n_boot=50, confidence=0.95, seed=0)
+
+    assert counts_ci["car"] == {"estimate": 40.0, "low": None, "high": None}
+    assert all(v == {"estimate": None, "low": None, "high": None} for v in speeds_ci.values())
@@ -0,0 +1,90 @@
+import numpy as np
+import pytest
+
+from frame_pool import FramePool
+
+SHAPE = (4, 6, 3)
+
+
+class FakeCapture:
+    """Yields n frames, decoding into the given image like cv2.VideoCapture.read(image=...)."""
+
+    def __init__(self, n, shape=SHAPE, in_place=True):
+        self.n = n
+        self.shape = shape
+        self.in_place = in_place
+        self.frame = 0
+
+    def read(self, image=None):
+        if self.frame >= self.n:
+            return False, None
+        self.frame += 1
+        if self.in_place and image is not None and image.shape == self.shape:
+            image[...] = self.frame
+            return True, image
+        return True, np.full(self.shape, self.frame, dtype=np.uint8)
+
+
+def test_buffers_are_used_in_turn():
+    pool = FramePool(SHAPE, size=3)
+    cap = FakeCapture(7)
+    used = []
+    while True:
+        buf = pool.read(cap, cap.frame + 1)
+        if buf is None: break
+        used.append(buf.index)
+        assert buf.array[0, 0, 0] == buf.frame_number
+        buf.release()
+
+    assert used == [0, 1, 2, 0, 1, 2, 0]
+    assert pool.copies == 0
+    assert pool.available == 3
+
+
+def test_buffer_returns_to_the_pool_after_the_last_release():
+    pool = FramePool(SHAPE, size=2)
+    buf = pool.acquire()
+    assert buf.refcount == 1
+
+    buf.retain()
+    buf.release()
+    assert pool.available == 1
+
+    buf.release()
+    assert pool.available == 2
+    assert pool.acquire() is not buf
+    assert pool.acquire() is buf
+
+
+def test_release_errors():
+    pool = FramePool(SHAPE, size=1)
+    buf = pool.acquire()
+    buf.release()
+    with pytest.raises(RuntimeError):
+        buf.release()
+    with pytest.raises(RuntimeError):
+        buf.retain()
+
+
+def test_acquire_times_out_when_all_buffers_are_held():
+    pool = FramePool(SHAPE, size=1)
+    pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.01)
+
+
+def test_decoder_allocations_are_copied_in():
+    pool = FramePool(SHAPE, size=2)
+    buf = pool.read(FakeCapture(1, in_place=False), 1)
+    assert np.all(buf.array == 1)
+    assert pool.copies == 1
+
+
+def test_shape_mismatch_and_end_of_stream_release_the_buffer():
+    pool = FramePool(SHAPE, size=1)
+    with pytest.raises(ValueError):
+        pool.read(FakeCapture(1, shape=(2, 2, 3)), 1)
+    assert pool.available == 1
+
+    assert pool.read(FakeCapture(0), 1) is None
+    assert pool.available == 1
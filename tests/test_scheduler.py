@@ -0,0 +1,121 @@
+import math
+
+import pytest
+
+from scheduler import LEVEL_REFUSE, LEVELS, LoadScheduler, NodeOverloadedError
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_scheduler(clock):
+    return LoadScheduler(window_frames=10, cooldown_s=5.0, clock=clock)
+
+
+def run(clock, streams, frames, fps):
+    """Ticks every stream once per frame while the clock advances at fps frames per second."""
+    for _ in range(frames):
+        clock.now += 1.0 / fps
+        for stream in streams:
+            stream.frame += 1
+            stream.tick(stream.frame)
+
+
+def run_until_next_change(clock, streams, fps, cooldown_s=5.0, window_frames=10):
+    """Runs whole measurement windows until the cooldown since the last level change has passed."""
+    windows = math.ceil(cooldown_s * fps / window_frames)
+    run(clock, streams, windows * window_frames, fps)
+
+
+def open_streams(scheduler, n):
+    streams = [scheduler.open_stream(f"job-{i}", 30.0) for i in range(n)]
+    for stream in streams:
+        stream.frame = 0
+    return streams
+
+
+def test_single_slow_stream_keeps_full_quality(clock):
+    scheduler = make_scheduler(clock)
+    (stream,) = open_streams(scheduler, 1)
+
+    # 10 fps against a 30 fps source, for far longer than several cooldowns.
+    run(clock, [stream], 300, fps=10)
+
+    assert scheduler.level == 0
+    assert stream.metadata()["degraded"] is False
+    assert stream.settings.render
+
+
+def test_contended_streams_step_down_once_per_cooldown(clock):
+    scheduler = make_scheduler(clock)
+    streams = open_streams(scheduler, 2)
+
+    run(clock, streams, 10, fps=15)
+    assert scheduler.level == 1
+
+    # Still slow, but within the cooldown: no further step.
+    run(clock, streams, 30, fps=15)
+    assert scheduler.level == 1
+
+    run_until_next_change(clock, streams, fps=15)
+    assert scheduler.level == 2
+    assert streams[0].settings.imgsz == scheduler.reduced_imgsz
+
+    degradations = streams[0].metadata()["degradations"]
+    assert [d["mode"] for d in degradations] == [LEVELS[1], LEVELS[2]]
+    assert all(d["source_fps"] == 30.0 for d in degradations)
+
+
+def test_contention_reaches_refusal_and_running_streams_stay_below_it(clock):
+    scheduler = make_scheduler(clock)
+    streams = open_streams(scheduler, 2)
+
+    run(clock, streams, 10, fps=15)
+    for _ in range(LEVEL_REFUSE - 1):
+        run_until_next_change(clock, streams, fps=15)
+
+    assert scheduler.level == LEVEL_REFUSE
+    with pytest.raises(NodeOverloadedError):
+        scheduler.open_stream("job-late", 30.0)
+    assert all(s.metadata()["final_level"] == LEVEL_REFUSE - 1 for s in streams)
+
+
+def test_recovers_when_fast_or_when_contention_ends(clock):
+    scheduler = make_scheduler(clock)
+    streams = open_streams(scheduler, 2)
+    run(clock, streams, 10, fps=15)
+    run_until_next_change(clock, streams, fps=15)
+    assert scheduler.level == 2
+
+    # Degraded settings made both streams fast: step back up.
+    run_until_next_change(clock, streams, fps=45)
+    assert scheduler.level == 1
+
+    # One job finishes; the other is slow but alone, so the node recovers.
+    streams[1].close()
+    run_until_next_change(clock, streams[:1], fps=15)
+    assert scheduler.level == 0
+    assert streams[0].metadata()["final_level"] == 0
+
+    streams[0].close()
+    assert scheduler.level == 0
+
+
+def test_stream_opened_on_degraded_node_records_its_starting_level(clock):
+    scheduler = make_scheduler(clock)
+    streams = open_streams(scheduler, 2)
+    run(clock, streams, 10, fps=15)
+
+    late = scheduler.open_stream("job-late", 30.0)
+    assert late.metadata()["degradations"][0]["frame"] == 0
+    assert late.metadata()["degradations"][0]["level"] == 1
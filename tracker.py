@@ -1,13 +1,19 @@
 
 import numpy as np
-from deep_sort_realtime.deepsort_tracker import DeepSort
 
 class Tracker:
-    def __init__(self, max_age=30, n_init=3, max_cosine_distance=0.2):
+    def __init__(self, max_age=30, n_init=3, max_cosine_distance=0.2, max_coast_frames=None):
         """
         Initializes the DeepSORT tracker, disabling the ReID embedder model 
         for immediate stability (relying on IOU tracking only).
+        max_coast_frames: if set, confirmed tracks that have gone unmatched for
+        more than this many frames are not reported (they are still kept alive
+        inside DeepSORT for max_age frames).
         """
+        self.max_coast_frames = max_coast_frames
+        # Imported lazily: deep_sort_realtime pulls in torch at import time.
+        from deep_sort_realtime.deepsort_tracker import DeepSort
+
         self.tracker = DeepSort(
             max_age=max_age, 
             n_init=n_init,
@@ -45,6 +51,8 @@ class Tracker:
         for track in tracks:
             if not track.is_confirmed():
                 continue
+            if self.max_coast_frames is not None and track.time_since_update > self.max_coast_frames:
+                continue
 
             track_id = track.track_id
             ltrb = track.to_ltrb()
@@ -1,7 +1,5 @@
 
-import cv2
 import json
-import pandas as pd 
 import os
 import numpy as np 
 
@@ -16,6 +14,7 @@ COLOR_MAP = {
 
 def draw_boxes(frame, tracked_objects, class_names, frame_number):
     """Draws bounding boxes, IDs, class names, and frame number on the frame."""
+    import cv2
     
     if isinstance(tracked_objects, np.ndarray):
         tracked_objects = tracked_objects.tolist()
@@ -41,27 +40,28 @@ def draw_boxes(frame, tracked_objects, class_names, frame_number):
 
 def save_reports(analysis_data, video_fps, output_dir="output", file_id="results"):
     """Saves the final results to JSON and CSV using a unique file_id."""
+    import pandas as pd
     
     
     json_path = os.path.join(output_dir, f"{file_id}_results.json")
-    analysis_data['metadata'] = {'video_fps': video_fps}
+    analysis_data.setdefault('metadata', {})['video_fps'] = video_fps
     with open(json_path, 'w') as f:
         json.dump(analysis_data, f, indent=4)
     
     
     summary_list = []
-    for obj_id, data in analysis_data['tracked_objects'].items():
+    for data in analysis_data['all_tracked_objects']:
         entry_time = round(data['entry_frame'] / video_fps, 2)
         exit_time = round(data['exit_frame'] / video_fps, 2)
-        duration = round(data['duration_frames'] / video_fps, 2)
+        duration = round(data['total_frames_tracked'] / video_fps, 2)
         
         summary_list.append({
-            'ID': obj_id,
-            'Class': data['class'],
+            'ID': data['track_id'],
+            'Class': data['class_name'],
             'Entry Time (s)': entry_time,
             'Exit Time (s)': exit_time,
             'Duration (s)': duration,
-            'Path Points': len(data['path'])
+            'Path Points': data['path_length']
         })
 
     df = pd.DataFrame(summary_list)